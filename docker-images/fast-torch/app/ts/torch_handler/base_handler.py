@@ -8,6 +8,7 @@ import logging
 import os
 import importlib.util
 import time
+from collections.abc import Mapping
 import torch
 from torch.profiler import profile, record_function, ProfilerActivity
 from ..utils.util import list_classes_from_module, load_label_mapping
@@ -99,14 +100,30 @@ class BaseHandler(abc.ABC):
 
     def _load_torchscript_model(self, model_pt_path):
         """Loads the PyTorch model and returns the NN model object.
+           Falls back to torch.load for modules saved without TorchScript.
 
         Args:
             model_pt_path (str): denotes the path of the model file.
 
+        Raises:
+            RuntimeError: It raises this error when the file holds a state_dict,
+                          which needs the modelFile with its class to be loaded.
+
         Returns:
             (NN Model Object) : Loads the model object.
         """
-        return torch.jit.load(model_pt_path, map_location=self.device)
+        try:
+            return torch.jit.load(model_pt_path, map_location=self.device)
+        except RuntimeError:
+            logger.debug("Not a torchscript model, loading pickled module")
+        model = torch.load(model_pt_path, map_location=self.device, weights_only=False)
+        if isinstance(model, Mapping):
+            raise RuntimeError(
+                "{} holds a state_dict, set modelFile to the file defining its model class".format(
+                    model_pt_path
+                )
+            )
+        return model
 
     def _load_pickled_model(self, model_dir, model_file, model_pt_path):
         """
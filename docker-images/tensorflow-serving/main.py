@@ -3,6 +3,25 @@ from pathlib import Path
 from ntcore import Client
 import proxy
 
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def extract_model(model_path, extract_path):
+    """
+    Extracts the model tarball, either zstd compressed or plain/gzip tar.
+    """
+    with open(model_path, "rb") as f:
+        if f.read(len(ZSTD_MAGIC)) == ZSTD_MAGIC:
+            import zstandard
+            f.seek(0)
+            with zstandard.ZstdDecompressor().stream_reader(f) as reader:
+                with tarfile.open(fileobj=reader, mode="r|") as tar:
+                    tar.extractall(extract_path)
+            return
+    with tarfile.open(model_path, "r:*") as tar:
+        tar.extractall(extract_path)
+
+
 def download_model():
     """
     Downloads model from ntcore server and place in the serving path.
@@ -16,13 +35,12 @@ def download_model():
 
     try:
         extract_path = os.path.join("/models", workspace_id)
-        model_path = os.path.join(extract_path, "model.tar.gz")
+        model_path = os.path.join(extract_path, "model.tar")
         Path(extract_path).mkdir(parents=True, exist_ok=True)
         # download model from ntcore
         ntcore_client.download_model(model_path, workspace_id)
-        # Unzip the file to get the original saved model
-        with tarfile.open(model_path, "r:gz") as tar:
-            tar.extractall(extract_path)
+        # Extract the tarball to get the original saved model
+        extract_model(model_path, extract_path)
         # Remove the binary model file
         os.remove(model_path)
         # tensorflow-serving requires version in number format
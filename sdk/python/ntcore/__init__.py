@@ -1,8 +1,9 @@
 from ntcore.client import Client
+from ntcore.integrations import register_post_import_hook
 from importlib import import_module
 
-for module in ["ntcore.integrations.sklearn", "ntcore.integrations.tensorflow", "ntcore.integrations.torch"]:
-    try:
-        import_module(module)
-    except Exception as e:
-        pass
+# Patch each framework once the user imports it, so importing ntcore does not pull them in.
+for framework, module in [("sklearn", "ntcore.integrations.sklearn"),
+                          ("tensorflow", "ntcore.integrations.tensorflow"),
+                          ("pytorch_lightning", "ntcore.integrations.torch")]:
+    register_post_import_hook(framework, lambda _, module=module: import_module(module))
@@ -1,10 +1,43 @@
 from .models.experiment import Experiment
 from .resources.api_client import ApiClient
+from .resources.background_uploader import BackgroundUploader
 from .integrations.utils import get_runtime_version
-from .libs.model_serializer import BaseModelSerializer, SklearnModelSerializer, TensorflowModelSerializer, TorchModelSerializer
+from .libs.model_serializer import BaseModelSerializer, SklearnModelSerializer, TensorflowModelSerializer, TorchModelSerializer, TempFilePool
+from .libs.shard_file import ShardFile
 from .models.framework import Framework
+from collections import deque
+from functools import lru_cache
 from importlib import import_module
-import json
+import atexit, json, sys
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Framework base classes and the serializer for their models, checked in order.
+_MODEL_SERIALIZERS = (
+    ('sklearn.base', 'BaseEstimator', SklearnModelSerializer),
+    ('tensorflow.keras', 'Model', TensorflowModelSerializer),
+    ('torch.nn', 'Module', TorchModelSerializer),
+)
+
+# Serializers for models given as a path on disk.
+_FRAMEWORK_SERIALIZERS = {
+    Framework.sklearn: SklearnModelSerializer,
+    Framework.tensorflow: TensorflowModelSerializer,
+    Framework.pytorch: TorchModelSerializer,
+}
+
+# Resolved serializer per model type, so the base class checks run once per type.
+_SERIALIZER_CACHE = dict()
+
+def _dumps(metadata) -> bytes:
+    '''
+    Encodes metadata as utf-8 JSON, with orjson when it is installed.
+    '''
+    if orjson is not None:
+        return orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(metadata).encode('utf-8')
 
 class Client(object):
     '''
@@ -19,8 +52,16 @@ class Client(object):
         Your UAT or Production API URL if applicable.
     :param encryptionData:
         Dictionary with params for encrypted requests (keys: clientPrivateKeySetLocation, keySetLocation, etc).
+    :param background_upload:
+        Sends serialized models from a background thread, so saving returns before the upload finishes.
+        Models given as a path are copied before saving returns. Call **flush** to wait for pending uploads.
+    :param checkpoint_shard_size:
+        Bytes of serialized checkpoints to accumulate per workspace before they are sent together in one request.
     .. note::
         **server** defaults to the NTCore Sandbox URL if not provided.
+    .. note::
+        PyTorch modules are saved as TorchScript. A state_dict is saved as is when the experiment
+        framework is pytorch, and can only be served with a modelFile defining its model class.
     '''
 
     def __init__(self,
@@ -29,7 +70,9 @@ class Client(object):
                  password=None,
                  program_token=None,
                  server="http://localhost:8000/",
-                 encryption_data=None):
+                 encryption_data=None,
+                 background_upload=False,
+                 checkpoint_shard_size=1 << 30):
         '''
         Create an instance of the API interface.
         This is the main interface the user will call to interact with the API.
@@ -39,7 +82,13 @@ class Client(object):
         self._program_token = program_token
         self._active_experiments = set()
         self._server = server
+        self._tempfile_pool = TempFilePool()
         self._api_client = ApiClient(self._username, self._password, self._server, encryption_data, api_token)
+        self._uploader = BackgroundUploader() if background_upload else None
+        self._checkpoint_shard_size = checkpoint_shard_size
+        self._checkpoints = dict()
+        self._failed_checkpoints = deque()
+        self._flush_registered = False
 
     def create_workspace(self, name):
         '''
@@ -121,39 +170,228 @@ class Client(object):
         if workspace_id is None:
             raise ValueError('Workspace id is required')
 
-        serializer = self.__get_model_serializer(experiment.serializable_model, experiment.framework)
-        payload = dict(
-            runtime = get_runtime_version(),
-            framework = serializer.framework().name,
-            parameters = json.dumps(experiment.pretraining_metadata).encode('utf-8'),
-            metrics = json.dumps(experiment.posttraining_metadata).encode('utf-8'))
-        files = dict(model = serializer.serialize(experiment.serializable_model))
-
-        self._api_client.doPost(self.__build_url(workspace_id, 'experiment'), payload, files=files)
+        serializer, fields, model_file = self.__serialize(experiment)
+        payload = dict(runtime = get_runtime_version(), **fields)
+        files = dict(model = model_file)
+        self.__post_models(self.__build_url(workspace_id, 'experiment'), payload, files, [serializer])
         self._active_experiments.discard(experiment)
-        serializer.close()
+
+    def save_models(self, experiments):
+        '''
+        Emits the metadata and serialized models of several experiments to NTCore server,
+        with a single request per workspace instead of one request per experiment.
+        '''
+        batches = dict()
+        for experiment in experiments:
+            if experiment.workspace_id is None:
+                raise ValueError('Workspace id is required')
+            batches.setdefault(experiment.workspace_id, []).append(experiment)
+
+        for workspace_id, batch in batches.items():
+            serialized = []
+            try:
+                for experiment in batch:
+                    serialized.append(self.__serialize(experiment))
+            except Exception:
+                for serializer, _, _ in serialized:
+                    serializer.close()
+                raise
+
+            parts = [(fields, model_file) for _, fields, model_file in serialized]
+            serializers = [serializer for serializer, _, _ in serialized]
+            self.__post_batch(workspace_id, parts, serializers)
+            for experiment in batch:
+                self._active_experiments.discard(experiment)
+
+    def checkpoint(self, experiment: Experiment, model, step: int):
+        '''
+        Serializes the model at the given training step and appends it to the workspace shard.
+        Buffered checkpoints are sent together once the shard exceeds the shard size, or on flush.
+        '''
+        if experiment.workspace_id is None:
+            raise ValueError('Workspace id is required')
+
+        # Snapshot the metadata, the experiment keeps changing while training goes on.
+        snapshot = Experiment(self, experiment.workspace_id)
+        snapshot.framework = experiment.framework
+        snapshot.pretraining_metadata = dict(experiment.pretraining_metadata)
+        snapshot.posttraining_metadata = dict(experiment.posttraining_metadata, step = step)
+        snapshot.serializable_model = model
+
+        self.__restore_checkpoints()
+        serializer, fields, model_file = self.__serialize(snapshot, copy_path = False)
+        try:
+            # Copy the model now, so paths overwritten by the next step don't change it.
+            if experiment.workspace_id not in self._checkpoints:
+                self._checkpoints[experiment.workspace_id] = (ShardFile(), [])
+                self.__register_flush()
+            shard, parts = self._checkpoints[experiment.workspace_id]
+            parts.append((fields, shard.append(model_file, str(getattr(model_file, 'name', 'model')))))
+        finally:
+            serializer.close()
+        if len(shard) >= self._checkpoint_shard_size:
+            self.__flush_checkpoints([experiment.workspace_id])
+
+    def flush(self):
+        '''
+        Sends the buffered checkpoints, then waits until all background uploads are sent,
+        raising the first upload error if any.
+        '''
+        self.__flush_checkpoints()
+        if self._uploader is not None:
+            self._uploader.flush()
+
+    def close(self):
+        '''
+        Waits for background uploads, then deletes the pooled temp files.
+        '''
+        try:
+            self.flush()
+        finally:
+            self._tempfile_pool.close()
+            if self._flush_registered:
+                atexit.unregister(self.flush)
+                self._flush_registered = False
+
+    def __register_flush(self):
+        '''
+        Flushes on interpreter exit, only once there is something to flush.
+        '''
+        if not self._flush_registered:
+            atexit.register(self.flush)
+            self._flush_registered = True
+
+    def __flush_checkpoints(self, workspace_ids=None):
+        '''
+        Sends the buffered checkpoint shards with one request per workspace. Shards are
+        taken out of the buffer one at a time, so a failed request keeps the rest buffered,
+        and the shard of the failed request is handed back to be sent on the next flush.
+        '''
+        self.__restore_checkpoints()
+        for workspace_id in list(self._checkpoints if workspace_ids is None else workspace_ids):
+            shard, parts = self._checkpoints.pop(workspace_id)
+            # Rewind the slices a failed request has read already.
+            for _, model_file in parts:
+                model_file.seek(0)
+            self.__post_batch(workspace_id, parts, [shard],
+                on_error = lambda entry = (workspace_id, shard, parts): self._failed_checkpoints.append(entry))
+
+    def __restore_checkpoints(self):
+        '''
+        Buffers the shards of failed checkpoint requests again. Checkpoints buffered for the
+        same workspace meanwhile are appended to the failed shard, so they stay in step order.
+        '''
+        while self._failed_checkpoints:
+            workspace_id, shard, parts = self._failed_checkpoints.popleft()
+            if workspace_id in self._checkpoints:
+                newer_shard, newer_parts = self._checkpoints[workspace_id]
+                for fields, model_file in newer_parts:
+                    model_file.seek(0)
+                    parts.append((fields, shard.append(model_file, model_file.name)))
+                newer_shard.close()
+            self._checkpoints[workspace_id] = (shard, parts)
+
+    def __serialize(self, experiment: Experiment, copy_path: bool = True):
+        '''
+        Returns the serializer, the metadata fields and the model file of an experiment.
+        '''
+        serializer = self.__get_model_serializer(experiment.serializable_model, experiment.framework)
+        try:
+            fields = dict(
+                framework = serializer.framework().name,
+                parameters = _dumps(experiment.pretraining_metadata),
+                metrics = _dumps(experiment.posttraining_metadata))
+            model_file = serializer.serialize(experiment.serializable_model)
+            if copy_path and self._uploader is not None and isinstance(experiment.serializable_model, str):
+                # Background uploads read the model later, by when the path may be overwritten.
+                model_file = serializer.snapshot()
+            return serializer, fields, model_file
+        except Exception:
+            # Hand back the temp file or directory of a failed serialization.
+            serializer.close()
+            raise
+
+    def __post_batch(self, workspace_id, parts, resources, on_error=None):
+        '''
+        Posts the metadata fields and model files of a workspace as the indexed fields of one request.
+        '''
+        payload = dict(runtime = get_runtime_version(), count = str(len(parts)))
+        files = dict()
+        for i, (fields, model_file) in enumerate(parts):
+            for name, value in fields.items():
+                payload['{0}_{1}'.format(name, i)] = value
+            files['model_{0}'.format(i)] = model_file
+        self.__post_models(self.__build_url(workspace_id, 'experiments'), payload, files, resources, on_error)
+
+    def __post_models(self, url, payload, files, resources, on_error=None):
+        '''
+        Posts the serialized models and closes the serializers or shards holding them,
+        on the background uploader if enabled. When the request fails and on_error is
+        given, it is called instead and the resources are left open to be sent again.
+        '''
+        def upload():
+            sent = False
+            try:
+                self._api_client.doPost(url, payload, files=files)
+                sent = True
+            finally:
+                if not sent and on_error is not None:
+                    on_error()
+                else:
+                    for resource in resources:
+                        resource.close()
+
+        if self._uploader is None:
+            upload()
+        else:
+            self.__register_flush()
+            self._uploader.submit(upload)
 
     def __get_model_serializer(self, model, framework: Framework) -> BaseModelSerializer:
         '''
         Returns the model serializer for frameworks, i.e., sklearn, tensorflow, pytorch
         '''
-        if self.__isinstance(model, 'sklearn.base', 'BaseEstimator') or (isinstance(model, str) and framework == Framework.sklearn):
-            return SklearnModelSerializer()
-        elif self.__isinstance(model, 'tensorflow.keras', 'Model') or (isinstance(model, str) and framework == Framework.tensorflow):
-            return TensorflowModelSerializer()
-        elif self.__isinstance(model, 'torch.nn', 'Module') or (isinstance(model, str) and framework == Framework.pytorch):
-            return TorchModelSerializer()
+        if isinstance(model, str):
+            serializer = _FRAMEWORK_SERIALIZERS.get(framework)
+        elif isinstance(model, dict) and framework == Framework.pytorch:
+            # A state_dict, which skips TorchScript compilation.
+            serializer = TorchModelSerializer
         else:
+            model_type = type(model)
+            if model_type not in _SERIALIZER_CACHE:
+                _SERIALIZER_CACHE[model_type] = self.__find_model_serializer(model_type)
+            serializer = _SERIALIZER_CACHE[model_type]
+        if serializer is None:
             raise Exception('Unable to determine model framework.')
+        return serializer(self._tempfile_pool)
+
+    def __find_model_serializer(self, model_type):
+        '''
+        Returns the serializer class of the first framework base class the model type derives from.
+        '''
+        for module, cls, serializer in _MODEL_SERIALIZERS:
+            base = self.__get_class(module, cls)
+            if base is not None and issubclass(model_type, base):
+                return serializer
+        return None
 
-    def __isinstance(self, model, module: str, cls: str) -> bool:
+    def __get_class(self, module: str, cls: str):
+        '''
+        Returns the framework class, or None if the framework has not been imported,
+        in which case no model can be an instance of it.
+        '''
+        if module.split('.')[0] not in sys.modules:
+            return None
         try:
-            return isinstance(model, getattr(import_module(module), cls))
+            return getattr(import_module(module), cls)
         except Exception:
-            return False
+            return None
 
-    def __build_url(self, *paths):
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def __build_url(*paths):
         '''
         Returns the NTCore endpoint for sending experiment data.
+        Memoized, since clients keep calling it with the same few workspace paths.
         '''
         return '/'.join(s.strip('/') for s in paths)
\ No newline at end of file
@@ -0,0 +1,57 @@
+import importlib.abc, importlib.util, sys
+
+
+class _PostImportFinder(importlib.abc.MetaPathFinder):
+    '''
+    Runs the registered hooks right after a watched module finishes importing.
+    '''
+
+    def __init__(self):
+        self._hooks = dict()
+        self._resolving = set()
+
+    def register(self, name, hook):
+        self._hooks.setdefault(name, []).append(hook)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname not in self._hooks or fullname in self._resolving:
+            return None
+        # Let the remaining finders locate the module, then wrap its loader.
+        self._resolving.add(fullname)
+        try:
+            spec = importlib.util.find_spec(fullname)
+        finally:
+            self._resolving.discard(fullname)
+        if spec is None or spec.loader is None or not hasattr(spec.loader, 'exec_module'):
+            return spec
+
+        hooks = self._hooks.pop(fullname)
+        exec_module = spec.loader.exec_module
+        def _exec_module(module):
+            exec_module(module)
+            _run_hooks(hooks, module)
+        spec.loader.exec_module = _exec_module
+        return spec
+
+
+def _run_hooks(hooks, module):
+    for hook in hooks:
+        try:
+            hook(module)
+        except Exception:
+            pass
+
+
+_finder = _PostImportFinder()
+
+def register_post_import_hook(name, hook):
+    '''
+    Calls hook(module) once the given module is imported, or immediately if it already is.
+    Used to patch frameworks without importing them eagerly from ntcore.
+    '''
+    if name in sys.modules:
+        _run_hooks([hook], sys.modules[name])
+        return
+    if _finder not in sys.meta_path:
+        sys.meta_path.insert(0, _finder)
+    _finder.register(name, hook)
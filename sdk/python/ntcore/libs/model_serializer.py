@@ -1,93 +1,201 @@
 from abc import ABC, abstractmethod
+from typing import BinaryIO
 from ..models.framework import Framework
-import pickle, tarfile, tempfile, os
+from .tar_stream import TarStream
+import io, logging, pickle, shutil, tarfile, tempfile, os, threading
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # Falls back to an uncompressed tarball
+
+# Protocol 5 lets numpy arrays hand their buffers to the pickler to be written
+# to the file directly, instead of copying each array into a bytes object first.
+PICKLE_PROTOCOL = min(5, pickle.HIGHEST_PROTOCOL)
+
+logger = logging.getLogger(__name__)
+
+
+class TempFilePool(object):
+    '''
+    Keeps truncated temporary files per suffix for reuse, so frequent saves
+    don't pay for creating and unlinking a temp file every time.
+    '''
+
+    def __init__(self, max_files: int = 4) -> None:
+        self._max_files = max_files
+        self._files = dict()
+        self._lock = threading.Lock()
+
+    def acquire(self, suffix: str):
+        with self._lock:
+            files = self._files.get(suffix)
+            if files:
+                return files.pop()
+        return tempfile.NamedTemporaryFile(suffix=suffix)
+
+    def release(self, suffix: str, file) -> None:
+        file.seek(0)
+        file.truncate(0)
+        with self._lock:
+            files = self._files.setdefault(suffix, [])
+            if len(files) < self._max_files:
+                files.append(file)
+                return
+        file.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for files in self._files.values():
+                for file in files:
+                    file.close()
+            self._files.clear()
 
 
 class BaseModelSerializer(ABC):
 
-    def __init__(self) -> None:
+    def __init__(self, pool: TempFilePool = None) -> None:
         super().__init__()
-
-    def serialize(self, model) -> bytes:
+        self._pool = pool if pool is not None else TempFilePool()
+        self._model_file = None
+        self._suffix = None
+
+    def serialize(self, model) -> BinaryIO:
+        '''
+        Returns a binary file object positioned at the start of the serialized model,
+        so the http layer can send it without loading it into memory.
+        '''
         return self._from_disk(model) if isinstance(model, str) else self._from_memory(model)
 
+    def snapshot(self) -> BinaryIO:
+        '''
+        Copies a model read from the user's path into a pooled temp file, so the
+        upload doesn't change when the path is overwritten before it is sent.
+        '''
+        if self._suffix is not None:
+            return self._model_file
+        source = self._model_file
+        suffix = os.path.splitext(str(getattr(source, 'name', '')))[1]
+        model_file = self._pool.acquire(suffix)
+        try:
+            shutil.copyfileobj(source, model_file, io.DEFAULT_BUFFER_SIZE * 128)
+        except Exception:
+            self._pool.release(suffix, model_file)
+            raise
+        self._release_model_file()
+        self._model_file = model_file
+        self._suffix = suffix
+        model_file.seek(0)
+        return model_file
 
-    @abstractmethod
-    def _from_memory(self, model) -> bytes:
-        pass
+    def close(self) -> None:
+        '''
+        Closes the opened model file, or hands the temp file back to the pool.
+        '''
+        self._release_model_file()
+
+    def _release_model_file(self) -> None:
+        if self._model_file is None:
+            return
+        if self._suffix is None:
+            self._model_file.close()
+        else:
+            self._pool.release(self._suffix, self._model_file)
+        self._model_file = None
+        self._suffix = None
+
+    def _open(self, path: str) -> BinaryIO:
+        self._release_model_file()
+        self._model_file = open(path, "rb")
+        return self._model_file
+
+    def _temp_file(self, suffix: str) -> BinaryIO:
+        self._release_model_file()
+        self._model_file = self._pool.acquire(suffix)
+        self._suffix = suffix
+        return self._model_file
 
     @abstractmethod
-    def _from_disk(self, path: str) -> bytes:
+    def _from_memory(self, model) -> BinaryIO:
         pass
 
     @abstractmethod
-    def framework(self) -> Framework:
+    def _from_disk(self, path: str) -> BinaryIO:
         pass
 
     @abstractmethod
-    def close(self) -> None:
+    def framework(self) -> Framework:
         pass
 
 
 class SklearnModelSerializer(BaseModelSerializer):
 
-    def _from_disk(self, path: str):
+    def _from_disk(self, path: str) -> BinaryIO:
         if not path.endswith(".pkl"):
             raise ValueError('Sklearn model should be a file with extension as .pkl')
-        return open(path, "rb").read()
+        return self._open(path)
 
-    def _from_memory(self, model):
-        return pickle.dumps(model)
+    def _from_memory(self, model) -> BinaryIO:
+        model_file = self._temp_file('.pkl')
+        pickle.dump(model, model_file, protocol=PICKLE_PROTOCOL)
+        model_file.seek(0)
+        return model_file
 
     def framework(self) -> Framework:
         return Framework.sklearn
 
-    def close(self) -> None:
-        pass
-
 
 class TensorflowModelSerializer(BaseModelSerializer):
 
-    def __init__(self) -> None:
-        super().__init__()
-        self._model_file = tempfile.NamedTemporaryFile(suffix='.tar.gz')
-        
-    def _gzip(self, dir) -> None:
-        tar = tarfile.open(self._model_file.name, "w:gz")
-        tar.add(dir, arcname="model")
-        tar.close()
-
-    def _from_disk(self, path: str) -> bytes:
+    def __init__(self, pool: TempFilePool = None) -> None:
+        super().__init__(pool)
+        self._model_dir = None
+
+    def _archive(self, dir) -> BinaryIO:
+        # Weight files barely compress, so skip gzip and use a fast zstd level
+        # when it is installed. Otherwise build the plain tarball while it is
+        # being uploaded, instead of staging it on disk.
+        if zstandard is None:
+            self._release_model_file()
+            self._model_file = TarStream(dir, "model")
+            return self._model_file
+        model_file = self._temp_file('.tar.zst')
+        compressor = zstandard.ZstdCompressor(level=1, threads=-1)
+        with compressor.stream_writer(model_file, closefd=False) as writer:
+            with tarfile.open(fileobj=writer, mode="w|") as tar:
+                tar.add(dir, arcname="model")
+        model_file.seek(0)
+        return model_file
+
+    def _from_disk(self, path: str) -> BinaryIO:
         if not os.path.isdir(path):
             raise ValueError('Tensorflow model should be a directory')
-        self._gzip(path)
-        return open(self._model_file.name, "rb").read()
+        return self._archive(path)
 
-    def _from_memory(self, model) -> bytes:
-        with tempfile.TemporaryDirectory() as model_dir:
-            model.save(model_dir)
-            self._gzip(model_dir)
-        return open(self._model_file.name, "rb").read()
+    def _from_memory(self, model) -> BinaryIO:
+        # The saved model has to outlive the upload when the tarball is streamed.
+        self.close()
+        self._model_dir = tempfile.TemporaryDirectory()
+        model.save(self._model_dir.name)
+        return self._archive(self._model_dir.name)
 
     def framework(self) -> Framework:
         return Framework.tensorflow
 
     def close(self) -> None:
-        self._model_file.close()
+        super().close()
+        if self._model_dir is not None:
+            self._model_dir.cleanup()
+            self._model_dir = None
 
 
 class TorchModelSerializer(BaseModelSerializer):
 
-    def __init__(self) -> None:
-        super().__init__()
-        self._model_file = tempfile.NamedTemporaryFile(suffix='.pt')
-
-    def _from_disk(self, path: str) -> bytes:
+    def _from_disk(self, path: str) -> BinaryIO:
         if not ((path.endswith(".pt") or path.endswith(".pth"))):
             raise ValueError('Pytorch model should be a file with extension as .pt or .pth')
-        return open(self._model_file.name, "rb").read()
+        return self._open(path)
 
-    def _from_memory(self, model) -> bytes:
+    def _from_memory(self, model) -> BinaryIO:
         ##################################
         ## Saving and loading extra files
         ##################################
@@ -96,13 +204,27 @@ class TorchModelSerializer(BaseModelSerializer):
         # extra_files = {'transform': None}
         # model = torch.jit.load('model_script.pt', _extra_files=extra_files)
         # transform = pickle.loads(extra_files['transform'])
-        from torch.jit import script
-        buffer = script(model)
-        buffer.save(self._model_file.name)
-        return open(self._model_file.name, "rb").read()
+        import torch
+        model_file = self._temp_file('.pt')
+        if isinstance(model, dict):
+            # A state_dict, e.g. a training checkpoint, is saved as is without scripting.
+            torch.save(model, model_file)
+        elif isinstance(model, torch.jit.ScriptModule):
+            # Already compiled, skip scripting it again.
+            model.save(model_file.name)
+        else:
+            try:
+                # Serving loads TorchScript, so it needs no model code to run.
+                torch.jit.script(model).save(model_file.name)
+            except Exception as e:
+                # Dynamic python the compiler rejects, store the pickled module instead.
+                logger.warning("Unable to script {0}, saving the pickled module instead. "
+                               "It can only be deployed where its class is importable: {1}".format(type(model).__name__, e))
+                model_file.seek(0)
+                model_file.truncate(0)
+                torch.save(model, model_file)
+        model_file.seek(0)
+        return model_file
 
     def framework(self) -> Framework:
         return Framework.pytorch
-
-    def close(self) -> None:
-        self._model_file.close()
\ No newline at end of file
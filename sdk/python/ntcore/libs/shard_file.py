@@ -0,0 +1,61 @@
+import io, os, shutil, tempfile
+
+
+class ShardFile(object):
+    '''
+    Rolling temporary file that serialized checkpoints are appended to. Each
+    checkpoint is read back as its own slice, so any number of buffered
+    checkpoints holds a single file descriptor.
+    '''
+
+    def __init__(self) -> None:
+        self._file = tempfile.NamedTemporaryFile(suffix='.shard')
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, source, name: str) -> 'ShardSlice':
+        '''
+        Copies the source file object to the end of the shard and returns its slice.
+        '''
+        offset = self._size
+        self._file.seek(offset)
+        shutil.copyfileobj(source, self._file, io.DEFAULT_BUFFER_SIZE * 128)
+        self._size = self._file.tell()
+        return ShardSlice(self._file, offset, self._size - offset, name)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ShardSlice(object):
+    '''
+    Read-only file object over one checkpoint of a shard.
+    '''
+
+    def __init__(self, file, offset: int, length: int, name: str) -> None:
+        self.name = os.path.basename(name)
+        self._file = file
+        self._offset = offset
+        self._length = length
+        self._position = 0
+
+    def __len__(self) -> int:
+        return self._length - self._position
+
+    def seek(self, offset: int) -> int:
+        '''
+        Moves to the given offset within the slice, e.g. to send it again after a failed request.
+        '''
+        self._position = min(max(offset, 0), self._length)
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > len(self):
+            size = len(self)
+        # Slices share the shard's handle, so always seek to this slice first.
+        self._file.seek(self._offset + self._position)
+        data = self._file.read(size)
+        self._position += len(data)
+        return data
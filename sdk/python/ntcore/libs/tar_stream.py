@@ -0,0 +1,75 @@
+import io, os, tarfile
+
+
+class TarStream(object):
+    '''
+    Read-only file object that produces an uncompressed tar archive of a directory
+    while it is read, so the archive can be uploaded without being written to disk.
+    The archive length is known upfront, which lets it be sent as a multipart part.
+    '''
+
+    def __init__(self, path: str, arcname: str) -> None:
+        self.name = arcname + '.tar'
+        # Only used to build tar headers the same way TarFile.add does.
+        self._tar = tarfile.open(fileobj=io.BytesIO(), mode='w')
+        self._members = list(self._collect(path, arcname))
+        size = sum(len(header) + self._padded(info.size) for _, info, header in self._members)
+        size += 2 * tarfile.BLOCKSIZE
+        self._length = -(-size // tarfile.RECORDSIZE) * tarfile.RECORDSIZE
+        self._position = 0
+        self._buffer = bytearray()
+        self._chunks = self._generate()
+
+    def __len__(self) -> int:
+        return self._length - self._position
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = len(self)
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self._position += len(data)
+        return data
+
+    def close(self) -> None:
+        self._chunks.close()
+        self._tar.close()
+
+    def _collect(self, path, arcname):
+        tarinfo = self._tar.gettarinfo(path, arcname)
+        if tarinfo is None:
+            return
+        yield path, tarinfo, tarinfo.tobuf(self._tar.format, self._tar.encoding, self._tar.errors)
+        if tarinfo.isdir():
+            for name in sorted(os.listdir(path)):
+                yield from self._collect(os.path.join(path, name), os.path.join(arcname, name))
+
+    def _generate(self):
+        written = 0
+        for path, tarinfo, header in self._members:
+            yield header
+            written += len(header)
+            if not tarinfo.isreg():
+                continue
+            remaining = tarinfo.size
+            with open(path, 'rb') as f:
+                while remaining > 0:
+                    chunk = f.read(min(remaining, io.DEFAULT_BUFFER_SIZE * 128))
+                    if not chunk:
+                        # Keep the declared size even if the file shrank meanwhile.
+                        chunk = bytes(remaining)
+                    remaining -= len(chunk)
+                    yield chunk
+            padding = self._padded(tarinfo.size) - tarinfo.size
+            yield bytes(padding)
+            written += tarinfo.size + padding
+        yield bytes(self._length - written)
+
+    @staticmethod
+    def _padded(size: int) -> int:
+        return -(-size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
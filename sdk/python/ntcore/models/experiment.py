@@ -77,15 +77,23 @@ class Experiment(object):
         '''
         Logs post-training metadata from model
         '''
-        self._pretraining_metadata = posttraining_metadata
+        self._posttraining_metadata = posttraining_metadata
 
     def save_model(self, serializable_model):
         '''
-        Saves the serializable model to NTCore server.
+        Saves the serializable model to NTCore server. With the pytorch framework, a state_dict
+        is saved as is and needs a modelFile defining its model class to be served.
         '''
         self.serializable_model = serializable_model
         self._client.save(self)
 
+    def checkpoint(self, serializable_model, step: int):
+        '''
+        Buffers the model at the given training step, to be sent along with other checkpoints.
+        A pytorch state_dict, e.g. model.state_dict(), is saved without scripting the module.
+        '''
+        self._client.checkpoint(self, serializable_model, step)
+
     def save(self):
         '''
         Same as save_model, only used after setting serializable_model property.
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 import json
+import os
 import requests
 import uuid
 from abc import ABC
@@ -7,6 +8,7 @@ from .encryption import Encryption
 from ..exceptions.exceptions import NTCoreAPIException
 from ..__about__ import __version__
 from requests_toolbelt.adapters.ssl import SSLAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
 try:
     from urllib.parse import urljoin
 except ImportError:
@@ -96,11 +98,19 @@ class ApiClient(ABC):
             The NTCore API supports **GET**, **POST**, **PUT** and **DELETE**.
         '''
 
+        data = self._getRequestData(data)
+        if files and not self.encrypted:
+            # Stream the multipart body from the file objects instead of
+            # letting requests build the whole payload in memory.
+            data = self._getMultipartData(data, files)
+            headers = dict(headers or {}, **{'Content-Type': data.content_type})
+            files = None
+
         try:
             response = self.session.request(
                 method=method,
                 url=urljoin(self.baseUrl, url),
-                data=self._getRequestData(data),
+                data=data,
                 headers=headers,
                 params=params,
                 files=files
@@ -253,6 +263,26 @@ class ApiClient(ABC):
 
         return (data if data is None else self.encryption.encrypt(data)) if self.encrypted else data
 
+    def _getMultipartData(self, data, files):
+        '''
+        Builds a streaming multipart encoder from the request data and files.
+
+        :param data:
+            A dictionary containing the form fields.
+        :param files:
+            Dictionary of ``'name': file-like-objects`` or ``'name': (filename, file-like-object[, content_type])``.
+        :returns:
+            A multipart encoder that reads the files in chunks while sending.
+        '''
+
+        fields = dict(data or {})
+        for name, value in files.items():
+            if not isinstance(value, tuple):
+                filename = os.path.basename(getattr(value, 'name', None) or name)
+                value = (filename, value, 'application/octet-stream')
+            fields[name] = value
+        return MultipartEncoder(fields=fields)
+
     def putDocument(self, partialUrl, data, files):
         '''
         Submit a PUT to the API.
@@ -0,0 +1,55 @@
+import logging, threading
+from queue import SimpleQueue
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundUploader(object):
+    '''
+    Single daemon thread that runs queued uploads in order, so callers
+    hand off serialized models instead of blocking on network I/O.
+    '''
+
+    def __init__(self):
+        self._queue = SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._errors = []
+
+    def submit(self, upload):
+        '''
+        Queues the upload callable, starting the uploader thread on first use.
+        '''
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(name='ntcore_uploader', target=self._run, daemon=True)
+                self._thread.start()
+        self._queue.put(upload)
+
+    def flush(self):
+        '''
+        Blocks until every queued upload is sent, then raises the first upload error if any.
+        '''
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0]
+
+    def _run(self):
+        while True:
+            upload = self._queue.get()
+            if isinstance(upload, threading.Event):
+                upload.set()
+                continue
+            try:
+                upload()
+            except BaseException as e:
+                # Keep the thread alive, a dead uploader would leave flush() waiting forever.
+                logger.error("Failed uploading model: {0!r}".format(e))
+                with self._lock:
+                    self._errors.append(e)
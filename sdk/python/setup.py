@@ -41,6 +41,10 @@ setup(
         "click",
         "ruamel.yaml"
     ],
+    extras_require={
+        "zstd": ["zstandard>=0.15"],
+        "orjson": ["orjson>=3.0"]
+    },
     entry_points={
         "console_scripts": [
             'ntcore = ntcore.cli.workflow:cli'
@@ -0,0 +1,317 @@
+from ..ntcore import client as client_module
+from ..ntcore.client import Client
+from ..ntcore.models.framework import Framework
+from ..ntcore.libs.tar_stream import TarStream
+from ..ntcore.libs.model_serializer import TempFilePool, SklearnModelSerializer, TensorflowModelSerializer
+from ..ntcore.exceptions.exceptions import NTCoreAPIException
+from unittest import mock
+from unittest.mock import patch
+from requests.exceptions import ConnectionError
+import unittest, io, json, os, tarfile, tempfile, threading
+
+client = Client()
+
+class UnpicklableModel(object):
+    def __reduce__(self):
+        raise TypeError("cannot pickle UnpicklableModel")
+
+class FailingKerasModel(object):
+    def __init__(self):
+        self.saved_to = None
+
+    def save(self, path):
+        self.saved_to = path
+        raise IOError("disk full")
+
+class ClientModuleTest(unittest.TestCase):
+    '''
+    Python Client Test Class
+    '''
+    def setUp(self):
+        self._model_dir = tempfile.TemporaryDirectory()
+        self._model_path = os.path.join(self._model_dir.name, "model.pkl")
+        with open(self._model_path, "wb") as f:
+            f.write(b"serialized-model")
+
+    def tearDown(self):
+        self._model_dir.cleanup()
+
+    def _start_run(self):
+        experiment = client.start_run("workspace_id")
+        experiment.framework = Framework.sklearn
+        experiment.pretraining_metadata = dict(penalty="l2")
+        experiment.posttraining_metadata = dict(auc=0.9)
+        return experiment
+
+    def test_log_metadata(self):
+        '''
+        test pre- and post-training metadata are logged separately
+        '''
+        experiment = client.start_run("workspace_id")
+        experiment.log_pretraining_metadata(dict(penalty="l2"))
+        experiment.log_posttraining_metadata(dict(auc=0.9))
+
+        assert experiment.pretraining_metadata == dict(penalty="l2")
+        assert experiment.posttraining_metadata == dict(auc=0.9)
+
+    @patch("requests.sessions.Session.request")
+    def test_save_model(self, mock_post):
+        '''
+        test save_model uploads the raw model bytes as multipart
+        '''
+        uploaded = dict()
+        def request(method=None, url=None, data=None, headers=None, **kwargs):
+            uploaded["content_type"] = headers["Content-Type"]
+            uploaded["body"] = data.read()
+            return mock.Mock(
+                status_code=201,
+                headers={'Content-Type': 'application/json'},
+                content=json.dumps(dict(workspaceId="workspace_id", version=1)))
+        mock_post.side_effect = request
+        self._start_run().save_model(self._model_path)
+
+        assert uploaded["content_type"].startswith("multipart/form-data")
+        assert b"serialized-model" in uploaded["body"]
+        assert b'name="framework"' in uploaded["body"]
+
+    @patch("requests.sessions.Session.request")
+    def test_save_models(self, mock_post):
+        '''
+        test save_models sends all experiments of a workspace in one request
+        '''
+        uploaded = []
+        def request(method=None, url=None, data=None, headers=None, **kwargs):
+            uploaded.append((url, data.read()))
+            return mock.Mock(
+                status_code=201,
+                headers={'Content-Type': 'application/json'},
+                content=json.dumps([dict(workspaceId="workspace_id", version=1)]))
+        mock_post.side_effect = request
+        experiments = [self._start_run(), self._start_run()]
+        for experiment in experiments:
+            experiment.serializable_model = self._model_path
+        client.save_models(experiments)
+
+        assert len(uploaded) == 1
+        url, body = uploaded[0]
+        assert url.endswith("/workspace_id/experiments")
+        assert b'name="model_0"' in body and b'name="model_1"' in body
+        assert b'name="metrics_1"' in body
+
+    @patch("requests.sessions.Session.request")
+    def test_background_upload(self, mock_post):
+        '''
+        test background uploads are sent by flush
+        '''
+        mock_post.return_value = mock.Mock(
+            status_code=201,
+            headers={'Content-Type': 'application/json'},
+            content=json.dumps(dict(workspaceId="workspace_id", version=1)))
+        background_client = Client(background_upload=True)
+        experiment = background_client.start_run("workspace_id")
+        experiment.framework = Framework.sklearn
+        experiment.save_model(self._model_path)
+        background_client.flush()
+
+        assert mock_post.call_count == 1
+
+    @patch("requests.sessions.Session.request")
+    def test_background_upload_copies_path(self, mock_post):
+        '''
+        test background uploads send the model as it was on save, not when it is uploaded
+        '''
+        uploaded = []
+        released = threading.Event()
+        def request(method=None, url=None, data=None, headers=None, **kwargs):
+            released.wait()
+            uploaded.append(data.read())
+            return mock.Mock(
+                status_code=201,
+                headers={'Content-Type': 'application/json'},
+                content=json.dumps(dict(workspaceId="workspace_id", version=1)))
+        mock_post.side_effect = request
+        background_client = Client(background_upload=True)
+        experiment = background_client.start_run("workspace_id")
+        experiment.framework = Framework.sklearn
+        for step in range(2):
+            with open(self._model_path, "wb") as f:
+                f.write("STEP{0}-".format(step).encode())
+            experiment.save_model(self._model_path)
+        with open(self._model_path, "wb") as f:
+            f.write(b"OVERWRITTEN")
+        released.set()
+        background_client.close()
+
+        assert len(uploaded) == 2
+        assert b"STEP0-" in uploaded[0] and b"STEP1-" in uploaded[1]
+        assert not any(b"OVERWRITTEN" in body for body in uploaded)
+
+    @patch("requests.sessions.Session.request")
+    def test_background_upload_error(self, mock_post):
+        '''
+        test flush raises upload errors instead of blocking, even for BaseException
+        '''
+        mock_post.side_effect = KeyboardInterrupt()
+        background_client = Client(background_upload=True)
+        experiment = background_client.start_run("workspace_id")
+        experiment.framework = Framework.sklearn
+        experiment.save_model(self._model_path)
+        with self.assertRaises(KeyboardInterrupt):
+            background_client.flush()
+        background_client.flush()
+
+    @patch("requests.sessions.Session.request")
+    def test_checkpoint(self, mock_post):
+        '''
+        test checkpoints are snapshotted into one shard and sent together on flush
+        '''
+        uploaded = []
+        def request(method=None, url=None, data=None, headers=None, **kwargs):
+            uploaded.append(data.read())
+            return mock.Mock(
+                status_code=201,
+                headers={'Content-Type': 'application/json'},
+                content=json.dumps([dict(workspaceId="workspace_id", version=1)]))
+        mock_post.side_effect = request
+        experiment = self._start_run()
+        fds = len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else None
+        for step in range(100):
+            # Overwriting the path each step must not change the buffered checkpoints.
+            with open(self._model_path, "wb") as f:
+                f.write("STEP{0}-".format(step).encode())
+            experiment.checkpoint(self._model_path, step)
+        assert len(uploaded) == 0
+        if fds is not None:
+            assert len(os.listdir('/proc/self/fd')) <= fds + 1
+
+        client.flush()
+        assert len(uploaded) == 1
+        assert b'name="model_99"' in uploaded[0]
+        assert b"STEP0-" in uploaded[0] and b"STEP2-" in uploaded[0] and b"STEP99-" in uploaded[0]
+        assert b'"step":2' in uploaded[0].replace(b" ", b"")
+
+    @patch("requests.sessions.Session.request")
+    def test_checkpoint_flush_error(self, mock_post):
+        '''
+        test a failed checkpoint request keeps its shard and the other workspaces buffered
+        '''
+        uploaded = []
+        def failure(method=None, url=None, data=None, headers=None, **kwargs):
+            data.read()
+            raise ConnectionError("Connection error")
+        def request(method=None, url=None, data=None, headers=None, **kwargs):
+            uploaded.append((url, data.read()))
+            return mock.Mock(
+                status_code=201,
+                headers={'Content-Type': 'application/json'},
+                content=json.dumps([dict(workspaceId="workspace_id", version=1)]))
+        mock_post.side_effect = failure
+        for workspace_id in ["workspace_a", "workspace_b"]:
+            experiment = client.start_run(workspace_id)
+            experiment.framework = Framework.sklearn
+            experiment.checkpoint(self._model_path, 0)
+        with self.assertRaises(NTCoreAPIException):
+            client.flush()
+        # Checkpoints buffered after the failure are sent along with the failed shard.
+        experiment = client.start_run("workspace_a")
+        experiment.framework = Framework.sklearn
+        experiment.checkpoint(self._model_path, 1)
+
+        mock_post.side_effect = request
+        client.flush()
+        assert sorted(url.split("/")[-2] for url, _ in uploaded) == ["workspace_a", "workspace_b"]
+        body = dict((url.split("/")[-2], body) for url, body in uploaded)["workspace_a"]
+        assert b'name="model_1"' in body and body.count(b"serialized-model") == 2
+        assert b'"step":1' in body.replace(b" ", b"")
+
+        uploaded.clear()
+        client.flush()
+        assert uploaded == []
+
+    def test_tempfile_pool(self):
+        '''
+        test the pool hands released files back truncated and keeps at most max_files
+        '''
+        pool = TempFilePool(max_files=1)
+        try:
+            first = pool.acquire('.pkl')
+            first.write(b"serialized-model")
+            pool.release('.pkl', first)
+            reused = pool.acquire('.pkl')
+            assert reused is first
+            assert reused.read() == b"" and os.path.getsize(reused.name) == 0
+            other = pool.acquire('.pt')
+            assert other is not first
+            other.close()
+
+            second = pool.acquire('.pkl')
+            pool.release('.pkl', reused)
+            pool.release('.pkl', second)
+            assert not reused.closed and second.closed
+        finally:
+            pool.close()
+        assert reused.closed
+
+    def test_serialize_error_releases_temp_file(self):
+        '''
+        test a failed pickle hands its temp file back to the client pool
+        '''
+        pool_client = Client()
+        experiment = pool_client.start_run("workspace_id")
+        experiment.framework = Framework.sklearn
+        experiment.serializable_model = UnpicklableModel()
+        with patch.dict(client_module._SERIALIZER_CACHE, {UnpicklableModel: SklearnModelSerializer}):
+            with self.assertRaises(TypeError):
+                experiment.save()
+        try:
+            files = pool_client._tempfile_pool._files['.pkl']
+            assert len(files) == 1
+            assert not files[0].closed and os.path.getsize(files[0].name) == 0
+        finally:
+            pool_client.close()
+
+    def test_serialize_error_removes_model_dir(self):
+        '''
+        test a failed TF save removes its staging directory
+        '''
+        pool_client = Client()
+        experiment = pool_client.start_run("workspace_id")
+        experiment.framework = Framework.tensorflow
+        experiment.serializable_model = FailingKerasModel()
+        with patch.dict(client_module._SERIALIZER_CACHE, {FailingKerasModel: TensorflowModelSerializer}):
+            with self.assertRaises(IOError):
+                experiment.save()
+        try:
+            assert experiment.serializable_model.saved_to is not None
+            assert not os.path.exists(experiment.serializable_model.saved_to)
+            assert pool_client._tempfile_pool._files == dict()
+        finally:
+            pool_client.close()
+
+    def test_tar_stream(self):
+        '''
+        test TarStream produces the same archive as TarFile.add
+        '''
+        long_dir = os.path.join(self._model_dir.name, "variables", "v" * 120)
+        os.makedirs(long_dir)
+        with open(os.path.join(long_dir, "weights"), "wb") as f:
+            f.write(os.urandom(70000))
+        os.symlink("model.pkl", os.path.join(self._model_dir.name, "symlink"))
+        os.link(self._model_path, os.path.join(self._model_dir.name, "hardlink"))
+
+        expected = io.BytesIO()
+        with tarfile.open(fileobj=expected, mode="w") as tar:
+            tar.add(self._model_dir.name, arcname="model")
+        stream = TarStream(self._model_dir.name, "model")
+        try:
+            assert len(stream) == len(expected.getvalue())
+            chunks = []
+            while True:
+                chunk = stream.read(4096)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            assert b"".join(chunks) == expected.getvalue()
+            assert len(stream) == 0
+        finally:
+            stream.close()
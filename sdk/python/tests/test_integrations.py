@@ -0,0 +1,67 @@
+from ..ntcore.integrations import register_post_import_hook
+import unittest, os, sys, subprocess, tempfile
+
+SDK_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class IntegrationsModuleTest(unittest.TestCase):
+    '''
+    Python Integrations Test Class
+    '''
+    def setUp(self):
+        self._package_dir = tempfile.TemporaryDirectory()
+        self._name = "ntcore_stub_framework"
+        os.mkdir(os.path.join(self._package_dir.name, self._name))
+        with open(os.path.join(self._package_dir.name, self._name, "__init__.py"), "w") as f:
+            f.write("VERSION = '1.0'\n")
+        sys.path.insert(0, self._package_dir.name)
+
+    def tearDown(self):
+        sys.path.remove(self._package_dir.name)
+        sys.modules.pop(self._name, None)
+        self._package_dir.cleanup()
+
+    def test_hook_after_import(self):
+        '''
+        test the hook fires once the module finishes importing
+        '''
+        hooked = []
+        register_post_import_hook(self._name, lambda module: hooked.append(module.VERSION))
+        assert hooked == []
+
+        __import__(self._name)
+        assert hooked == ['1.0']
+
+    def test_hook_already_imported(self):
+        '''
+        test the hook fires immediately when the module is already imported
+        '''
+        __import__(self._name)
+        hooked = []
+        register_post_import_hook(self._name, lambda module: hooked.append(module.VERSION))
+        assert hooked == ['1.0']
+
+    def test_import_defers_frameworks(self):
+        '''
+        test importing ntcore does not load an installed framework until it is imported
+        '''
+        stub = {
+            "__init__.py": "",
+            "utils/__init__.py": "class Estimator(object):\n    pass\n"
+                                 "def all_estimators():\n    return [('Estimator', Estimator)]\n",
+            "model_selection/__init__.py": "class GridSearchCV(object):\n    pass\n"
+                                           "class RandomizedSearchCV(object):\n    pass\n",
+            "pipeline/__init__.py": "class Pipeline(object):\n    pass\n",
+        }
+        for name, source in stub.items():
+            path = os.path.join(self._package_dir.name, "sklearn", name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(source)
+
+        code = ("import sys, ntcore; "
+                "print(','.join(m for m in ('sklearn', 'tensorflow', 'torch', 'pytorch_lightning') if m in sys.modules)); "
+                "import sklearn; "
+                "print('ntcore.integrations.sklearn' in sys.modules)")
+        env = dict(os.environ, PYTHONPATH=self._package_dir.name)
+        output = subprocess.check_output([sys.executable, "-c", code], cwd=SDK_ROOT, env=env)
+        assert output.split() == [b"True"]
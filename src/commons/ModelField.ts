@@ -0,0 +1,13 @@
+/**
+ * Multipart field names uploaded models are stored under, which become part of their storage path.
+ * "model" is used by single experiments, "model_<i>" by experiment batches.
+ */
+export const MODEL_FIELDNAME_PATTERN = /^model(_\d+)?$/
+/**
+ * Multipart field names of the models in an experiment batch.
+ */
+export const BATCH_MODEL_FIELDNAME_PATTERN = /^model_\d+$/
+/**
+ * Maximum number of models in an experiment batch.
+ */
+export const MAX_BATCH_MODELS = 1000
@@ -7,6 +7,7 @@ import { Runtime } from "../commons/Runtime";
 import { ErrorHandler } from '../libs/utils/ErrorHandler';
 import { RequestValidator } from '../libs/utils/RequestValidator';
 import { appConfig } from '../libs/config/AppConfigProvider';
+import { IllegalArgumentException } from '../commons/Errors';
 
 const AUTH_USER_HEADER_NAME = "X-NTCore-Auth-User";
 
@@ -15,6 +16,7 @@ export class ExperimentController
     public constructor()
     {
         this.createExperimentV1 = this.createExperimentV1.bind(this);
+        this.createExperimentsV1 = this.createExperimentsV1.bind(this);
         this.listExperimentsV1 = this.listExperimentsV1.bind(this);
         this.getExperimentsV1 = this.getExperimentsV1.bind(this);
         this.deleteExperimentV1 = this.deleteExperimentV1.bind(this);
@@ -62,6 +64,79 @@ export class ExperimentController
         }
     }
 
+    /**
+     * Endpoint to create a batch of experiments in one request.
+     * The i-th experiment is sent as the multipart fields model_i, framework_i, parameters_i and metrics_i.
+     * @param req Request
+     * @param res Response
+     * Example usage:
+     * curl -F count=1 -F runtime=python-3.8 -F framework_0=sklearn -F 'parameters_0={"penalty": "l2"}' -F 'metrics_0={"auc": 0.9}' \
+     *      -F model_0=@model.pkl -X POST http://localhost:8180/dsp/api/v1/C123/experiments
+     */
+    public async createExperimentsV1(
+        req: Request<{workspaceId: string}, {}, {[field: string]: string}, {}>,
+        res: Response<Experiment[]>)
+    {
+        const { workspaceId } = req.params;
+        const { runtime, count } = req.body;
+        try {
+            RequestValidator.validateRequest(workspaceId, count);
+            await RequestValidator.throwOnException(() => workspaceProvider.read(workspaceId));
+            // Validate the whole batch upfront, so it is either created entirely or not at all.
+            const total = Number(count);
+            const files = (Array.isArray(req.files) ? req.files : []) as Express.Multer.File[];
+            const fieldnames = new Set(files.map(file => file.fieldname));
+            if (!Number.isInteger(total) || total <= 0 || files.length !== total) {
+                throw new IllegalArgumentException();
+            }
+            const entries = [];
+            for (let i = 0; i < total; i++) {
+                const framework = req.body[`framework_${i}`];
+                RequestValidator.validateRequest(framework, fieldnames.has(`model_${i}`));
+                entries.push({
+                    framework: framework as Framework,
+                    parameters: ExperimentController.parseJsonField(req.body[`parameters_${i}`]),
+                    metrics: ExperimentController.parseJsonField(req.body[`metrics_${i}`]),
+                    description: req.body[`description_${i}`]
+                });
+            }
+            const state = "UNREGISTERED" as ExperimentState;
+            const createdBy = req.get(AUTH_USER_HEADER_NAME) ?? appConfig.account.username;
+            const experiments: Experiment[] = [];
+            for (let i = 0; i < total; i++) {
+                const version = await workspaceProvider.incrementVersion(workspaceId);
+                const experiment: Experiment = {
+                    workspaceId,
+                    version,
+                    runtime: runtime as Runtime,
+                    ...entries[i],
+                    state,
+                    createdBy: createdBy,
+                    createdAt: Math.floor((new Date()).getTime()/1000)
+                }
+                await Promise.all([storageProvider.putObject(workspaceId, version, `model_${i}`), experimentProvider.create(experiment)]);
+                experiments.push(experiment);
+            }
+            res.status(201).send(experiments);
+        } catch (err) {
+            ErrorHandler.handleException(err, res);
+        }
+    }
+
+    /**
+     * Parses a JSON encoded multipart field.
+     * @param value field value
+     * @returns parsed object
+     */
+    private static parseJsonField(value: string): { [key: string]: string | number }
+    {
+        try {
+            return JSON.parse(value);
+        } catch (e) {
+            throw new IllegalArgumentException();
+        }
+    }
+
     /**
      * Endpoint to list experiment based on the given workspace id.
      * @param req Request
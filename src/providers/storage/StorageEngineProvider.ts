@@ -19,9 +19,9 @@ export interface StorageProvider
      */
     createWorkspace: (workspaceId: string) => Promise<void>
     /**
-     * Moves object to the target location.
+     * Moves object uploaded under the given field name to the target location.
      */
-    putObject: (workspaceId: string, version: number) => Promise<void>
+    putObject: (workspaceId: string, version: number, name?: string) => Promise<void>
     /**
      * Returns the path for the object
      */
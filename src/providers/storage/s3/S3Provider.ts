@@ -3,6 +3,8 @@ import { StorageProvider } from "../StorageEngineProvider";
 import { StorageEngine } from "multer";
 import { appConfig } from "../../../libs/config/AppConfigProvider";
 import { AppConfigS3 } from "../../../libs/config/AppConfigStorage";
+import { IllegalArgumentException } from "../../../commons/Errors";
+import { MODEL_FIELDNAME_PATTERN } from "../../../commons/ModelField";
 import * as S3 from "aws-sdk/clients/s3";
 import multerS3 = require('multer-s3');
 
@@ -29,7 +31,11 @@ export class S3Provider implements StorageProvider
             },
             key: function (req: Request, file: any, cb: any) {
                 // TODO: Append useId as suffix to avoid multi user conflicts
-                cb(null, config.root + `/${req.params.workspaceId}/models/.tmp/model`);
+                // The field name is client supplied, only model fields may become a key.
+                if (!MODEL_FIELDNAME_PATTERN.test(file.fieldname)) {
+                    return cb(new IllegalArgumentException(`Unexpected model field ${file.fieldname}`));
+                }
+                cb(null, config.root + `/${req.params.workspaceId}/models/.tmp/${file.fieldname}`);
             }
         });
     }
@@ -47,18 +53,19 @@ export class S3Provider implements StorageProvider
      * Moves object to the target location.
      * @param workspaceId workspace id
      * @param version model version
+     * @param name field name of the uploaded model
      */
-    public async putObject(workspaceId: string, version: number): Promise<void>
+    public async putObject(workspaceId: string, version: number, name: string = "model"): Promise<void>
     {
         const config = appConfig.storage.config as AppConfigS3;
         await this._s3Client.copyObject({
             Bucket: config.bucket,
-            CopySource: `${config.bucket}/${config.root}/${workspaceId}/models/.tmp/model`,
+            CopySource: `${config.bucket}/${config.root}/${workspaceId}/models/.tmp/${name}`,
             Key: `${config.root}/${workspaceId}/models/v${version}/model`,
         }).promise()
         await this._s3Client.deleteObject({
             Bucket: config.bucket,
-            Key: `${config.root}/${workspaceId}/models/.tmp/model}`,
+            Key: `${config.root}/${workspaceId}/models/.tmp/${name}`,
         }).promise();
     }
 
@@ -2,6 +2,8 @@ import { Request, RequestHandler, Response } from 'express';
 import { StorageEngine } from "multer";
 import { StorageProvider } from "../StorageEngineProvider";
 import { appConfig } from "../../../libs/config/AppConfigProvider";
+import { IllegalArgumentException } from "../../../commons/Errors";
+import { MODEL_FIELDNAME_PATTERN } from "../../../commons/ModelField";
 import * as multer from 'multer';
 const fsPromises = require('fs').promises;
 
@@ -23,7 +25,11 @@ export class DockerVolumeProvider implements StorageProvider
             },
             filename: function (req, file, cb) 
             {
-                cb(null, "model");
+                // The field name is client supplied, only model fields may become a file name.
+                if (!MODEL_FIELDNAME_PATTERN.test(file.fieldname)) {
+                    return cb(new IllegalArgumentException(`Unexpected model field ${file.fieldname}`), null);
+                }
+                cb(null, file.fieldname);
             }
         });
     }
@@ -45,11 +51,12 @@ export class DockerVolumeProvider implements StorageProvider
      * Moves object to the target location.
      * @param workspaceId workspace id
      * @param version model version
+     * @param name field name of the uploaded model
      */
-    public async putObject(workspaceId: string, version: number): Promise<void>
+    public async putObject(workspaceId: string, version: number, name: string = "model"): Promise<void>
     {
         const root = appConfig.storage.config.root;
-        const tempPath = root + `/${workspaceId}/models/.tmp/model`;
+        const tempPath = root + `/${workspaceId}/models/.tmp/${name}`;
         const targetPath = root + `/${workspaceId}/models/v${version}`;
         await fsPromises.mkdir(targetPath);
         await fsPromises.rename(tempPath, targetPath + "/model");
@@ -4,6 +4,9 @@ import { DeploymentController } from "../controllers/DeploymentController";
 import { ExperimentController } from "../controllers/ExperimentController";
 import { WorkspaceController } from "../controllers/WorkspaceController";
 import { storageProvider } from "../libs/config/AppModule";
+import { ErrorHandler } from "../libs/utils/ErrorHandler";
+import { IllegalArgumentException } from "../commons/Errors";
+import { BATCH_MODEL_FIELDNAME_PATTERN, MAX_BATCH_MODELS } from "../commons/ModelField";
 
 export class Routes 
 {
@@ -51,7 +54,37 @@ export class Routes
         app.post('/dsp/api/v1/:workspaceId/experiment', 
             multer({ storage: storageProvider.getStorageEngine() }).single('model'), 
             this.experimentController.createExperimentV1);
+        app.post('/dsp/api/v1/:workspaceId/experiments',
+            this.uploadBatchModels(),
+            this.experimentController.createExperimentsV1);
         app.get('/dsp/api/v1/:workspaceId/models/:version',
             storageProvider.getObjectProxy())
     }
+
+    /**
+     * Returns middleware storing the models of an experiment batch, which only accepts
+     * model_<i> fields so that no other field name reaches the storage engine.
+     */
+    private uploadBatchModels(): express.RequestHandler
+    {
+        const upload = multer({
+            storage: storageProvider.getStorageEngine(),
+            limits: { files: MAX_BATCH_MODELS },
+            fileFilter: function (req, file, cb)
+            {
+                if (!BATCH_MODEL_FIELDNAME_PATTERN.test(file.fieldname)) {
+                    return cb(new IllegalArgumentException(`Unexpected model field ${file.fieldname}`));
+                }
+                cb(null, true);
+            }
+        }).any();
+        return (req, res, next) => upload(req, res, (err) => {
+            if (!err) {
+                return next();
+            }
+            // Reject bad uploads with 400, multer has removed the files it stored already.
+            ErrorHandler.handleException(
+                err instanceof multer.MulterError ? new IllegalArgumentException(err.message) : err, res);
+        });
+    }
 }
\ No newline at end of file